@@ -9,15 +9,19 @@ import os
 import re
 import json
 import io
+import codecs
+import random
+import zlib
+import unicodedata
 import email.utils
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 
 # =========================
 # 基本設定
@@ -26,6 +30,7 @@ from urllib.parse import urljoin
 JST = timezone(timedelta(hours=+9))
 TODAY = datetime.now(JST).strftime("%Y-%m-%d")
 REPORT_FILE = "update_report.csv"
+ENCODING_CACHE_FILE = "encoding_cache.json"
 
 KEYWORDS = ["ガイドライン", "指針", "診療手引き", "診療指針", "治療指針", "取扱い規約"]
 HEADERS = {"User-Agent": "Mozilla/5.0"}
@@ -193,11 +198,126 @@ def get_last_modified(url: str) -> DateEvidence:
     except Exception:
         return _unknown(url)
 
+# =========================
+# 文字コード（ホスト単位の学習キャッシュ）
+# =========================
+
+# 宣言が無い場合に試す順序。EUC-JP を Shift_JIS(cp932) より先に試すのは、
+# EUC-JP のバイト列は cp932 の半角カナとしても「成功」してしまうため。
+FALLBACK_CHARSETS = ["utf_8", "euc_jp", "cp932"]
+
+# Python の codecs が知らない、または上位互換に寄せたい別名
+CHARSET_ALIASES = {
+    "shift_jis": "cp932",
+    "x-sjis": "cp932",
+    "windows-31j": "cp932",
+    "x-euc-jp": "euc_jp",
+}
+
+# どんなバイト列でも decode に成功してしまうため、宣言されていても信用度が低い
+WEAK_CHARSETS = {"iso8859_1", "cp1252"}
+
+CHARSET_HEADER_RE = re.compile(r"charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+CHARSET_META_RE = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+
+_encoding_cache: Optional[Dict[str, str]] = None
+_encoding_cache_dirty = False
+
+def _normalize_charset(name: str) -> Optional[str]:
+    n = (name or "").strip().lower()
+    if not n:
+        return None
+    n = CHARSET_ALIASES.get(n, n)
+    try:
+        n = codecs.lookup(n).name.replace("-", "_")
+    except LookupError:
+        return None
+    # codecs.lookup("shift_jis") などの正規名も cp932 に寄せる（機種依存文字対策）
+    return CHARSET_ALIASES.get(n, n)
+
+def _load_encoding_cache() -> Dict[str, str]:
+    global _encoding_cache
+    if _encoding_cache is None:
+        _encoding_cache = {}
+        if os.path.exists(ENCODING_CACHE_FILE):
+            try:
+                with open(ENCODING_CACHE_FILE, encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    _encoding_cache = {str(k): str(v) for k, v in data.items()}
+            except Exception:
+                _encoding_cache = {}
+    return _encoding_cache
+
+def save_encoding_cache() -> None:
+    if _encoding_cache is None or not _encoding_cache_dirty:
+        return
+    try:
+        with open(ENCODING_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(_encoding_cache, f, ensure_ascii=False, indent=2, sort_keys=True)
+    except Exception as e:
+        print(f"[WARN] encoding cache not saved: {e}")
+
+def _charset_candidates(content: bytes, content_type: str, cached: Optional[str] = None) -> List[str]:
+    """
+    HTTPヘッダ → meta タグ → ホストのキャッシュ → 既定の順で文字コード候補を返す（重複なし）。
+    ページ自身の明示的な宣言をキャッシュより優先する（cp932 などは他の文字コードの
+    バイト列でも文字化けしたまま decode に成功してしまうため）。
+    iso8859_1 等の「必ず decode できてしまう」宣言は最後に回す。
+    """
+    declared: List[Optional[str]] = []
+    m = CHARSET_HEADER_RE.search(content_type or "")
+    if m:
+        declared.append(_normalize_charset(m.group(1)))
+    m = CHARSET_META_RE.search(content[:4096])
+    if m:
+        declared.append(_normalize_charset(m.group(1).decode("ascii", "ignore")))
+
+    strong = [c for c in declared if c and c not in WEAK_CHARSETS]
+    weak = [c for c in declared if c and c in WEAK_CHARSETS]
+
+    out: List[str] = []
+    for c in strong + ([cached] if cached else []) + FALLBACK_CHARSETS + weak:
+        if c not in out:
+            out.append(c)
+    return out
+
+def decode_html(url: str, content: bytes, content_type: str = "") -> Union[str, bytes]:
+    """
+    ホスト単位で学習した文字コードで本文を decode する。
+
+    - ヘッダ・meta に明示的な宣言があればそれを使う（先頭 4KB を見るだけで判定はしない）。
+    - 宣言が無ければ、キャッシュ済みのホストは判定を省略してその文字コードで decode する。
+    - いずれも失敗した場合は既定候補の順に strict decode を試す。
+      成功した文字コードはホストの値として記録する。
+    - どれも失敗した場合は bytes のまま返し、BeautifulSoup の判定に任せる。
+    """
+    global _encoding_cache_dirty
+    cache = _load_encoding_cache()
+    host = urlparse(url).netloc.lower()
+
+    for enc in _charset_candidates(content, content_type, cache.get(host)):
+        try:
+            text = content.decode(enc)
+        except (UnicodeDecodeError, LookupError):
+            continue
+        if host and cache.get(host) != enc:
+            cache[host] = enc
+            _encoding_cache_dirty = True
+        return text
+
+    return content
+
+def fetch_html(url: str) -> Union[str, bytes]:
+    r = requests.get(url, headers=HEADERS, timeout=TIMEOUT_GET)
+    r.raise_for_status()
+    return decode_html(url, r.content, r.headers.get("Content-Type", ""))
+
 # =========================
 # HTML抽出
 # =========================
 
-def _extract_from_html(url: str, html: bytes) -> Dict[str, DateEvidence]:
+def _extract_from_html(url: str, html: Union[str, bytes]) -> Dict[str, DateEvidence]:
     soup = BeautifulSoup(html, "html.parser")
     for tag in soup(["script", "style", "noscript", "header", "footer", "nav"]):
         tag.decompose()
@@ -306,6 +426,299 @@ def extract_year_hint(text: str) -> str:
     m = re.search(r"(20\d{2})", text or "")
     return m.group(1) if m else ""
 
+# =========================
+# 重複統合（文字 n-gram MinHash）
+# =========================
+
+# 類似度計算の前に取り除く汎用語。残った固有部分（疾患名など）で比較する。
+GENERIC_TITLE_WORDS = KEYWORDS + ["診療", "取扱い", "規約", "年版", "改訂", "増補", "版"]
+# 学会サイトの案内リンク（「ガイドライン一覧」など）に現れる語。主題ではないので比較から外す
+NAV_TITLE_WORDS = ["一覧", "情報", "について", "お知らせ", "委員会", "統括", "修正", "転載", "利用"]
+
+SHINGLE_SIZE = 2
+MINHASH_PERM = 60
+MINHASH_BANDS = 20  # 1バンド 3 行 → Jaccard 0.6 のペアは 99% 以上の確率で候補化される
+# 候補ペアは署名ではなく実際の n-gram 集合の Jaccard 係数で判定する
+JACCARD_THRESHOLD = 0.6
+# 固有部分がこれより短い（例:「乳癌」だけ）タイトル同士は、年版か版数が一致する場合のみ統合する
+MIN_SHINGLES = 3
+_MINHASH_PRIME = (1 << 61) - 1
+# h(x) = (a*x + b) mod p。a, b を [1, p) / [0, p) から取らないと各ハッシュが独立にならない。
+# 実行ごとに署名が変わらないようシードは固定する
+_MINHASH_RNG = random.Random(20260101)
+_MINHASH_PARAMS = [
+    (_MINHASH_RNG.randrange(1, _MINHASH_PRIME), _MINHASH_RNG.randrange(0, _MINHASH_PRIME))
+    for _ in range(MINHASH_PERM)
+]
+
+EDITION_YEAR_RE = re.compile(r"(20\d{2})")
+EDITION_DATE_RE = re.compile(r"20\d{2}\s*(年度?)?\s*(\d{1,2}\s*月)?")
+EDITION_NUM_RE = re.compile(r"第\s*(\d+)\s*版")
+# 書店一覧の「編集) ○○学会 4,950円 (4,500円+税) あり」「日本膵臓学会編集) …」のような付帯情報。
+# 編者名は版表記（第N版）や文書種別（規約・指針・ガイドライン）をまたがない範囲だけ取り除く。
+TITLE_NOISE_RE = re.compile(
+    r"(?:(?!ガイドライン)[^\s\d版約針)）])*(学会|研究会|研究班|委員会|編集部)\s*(監修)?編集\s*[)）].*$"
+    r"|(監修)?編集\s*[)）].*$"
+    r"|[\d,]+\s*円.*$"
+)
+
+# 同じ疾患名でも文書の種類が違えば別物（例: 乳癌診療ガイドライン と 乳癌取扱い規約）
+DOC_KINDS = ["規約", "指針", "手引き", "ガイドライン"]
+# 本体とは別に掲載される付属資料。本体（いずれも含まない）とは統合しない
+VARIANT_WORDS = ["英語", "英文", "文献検索式", "アップデイト", "アプリ"]
+# 同じ版でも分冊・対象読者が違えば別の本（例: 病理編 と 臨床編、医師用 と 患者用）。長い語から照合する
+PART_WORDS = [
+    "疫学・診断編", "病理編", "臨床編", "治療編", "診断編", "診療編", "総論", "各論",
+    "医師用", "患者用", "看護師用", "薬剤師用", "一般向け", "市民向け",
+]
+PART_NUM_RE = re.compile(r"第\s*(\d+)\s*部")
+
+def extract_edition(title: str, edition_hint: str = "") -> Tuple[str, str, str, str, str]:
+    """
+    タイトル（と版情報）から (年版, 第N版, 文書種別, 分冊・対象, 付属資料種別) を取り出す。
+    付属資料種別は本体なら "本体"、それ以外の要素は該当が無ければ空文字。
+    """
+    t = TITLE_NOISE_RE.sub("", unicodedata.normalize("NFKC", title or ""))
+    y = EDITION_YEAR_RE.search(t) or EDITION_YEAR_RE.search(edition_hint or "")
+    n = EDITION_NUM_RE.search(t)
+    kind = next((k for k in DOC_KINDS if k in t), "")
+    parts = [f"第{m.group(1)}部" for m in PART_NUM_RE.finditer(t)]
+    rest = t
+    for w in PART_WORDS:
+        if w in rest:
+            parts.append(w)
+            rest = rest.replace(w, "")
+    part = ",".join(parts)
+    variant = ",".join(w for w in VARIANT_WORDS if w in t) or "本体"
+    return (y.group(1) if y else "", n.group(1) if n else "", kind, part, variant)
+
+def _editions_compatible(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    # 各要素とも、両方に記載があって食い違う場合のみ別物とみなす
+    return all(not x or not y or x == y for x, y in zip(a, b))
+
+def _editions_confirmed(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    # 年版または版数が両方に明記され、かつ一致している
+    return any(x and x == y for x, y in zip(a[:2], b[:2]))
+
+def _edition_specificity(e: Tuple[str, ...]) -> int:
+    # 年版・版数・文書種別・分冊のうち判明している数（付属資料種別は常に埋まっている）
+    return sum(1 for x in e[:4] if x)
+
+def _edition_covers(partial: Tuple[str, ...], full: Tuple[str, ...]) -> bool:
+    # full が partial の記載をすべて満たし、かつより多くの情報を持つ
+    return (
+        all(not x or x == y for x, y in zip(partial, full))
+        and _edition_specificity(full) > _edition_specificity(partial)
+    )
+
+def _title_shingles(title: str) -> set:
+    t = TITLE_NOISE_RE.sub("", unicodedata.normalize("NFKC", title or "")).lower()
+    t = EDITION_NUM_RE.sub("", t)
+    t = EDITION_DATE_RE.sub("", t)
+    for w in GENERIC_TITLE_WORDS + NAV_TITLE_WORDS:
+        t = t.replace(w, "")
+    t = re.sub(r"[^\wぁ-んァ-ン一-龥]", "", t)
+    if len(t) < SHINGLE_SIZE:
+        return set()
+    return {t[i:i + SHINGLE_SIZE] for i in range(len(t) - SHINGLE_SIZE + 1)}
+
+def _minhash(shingles: set) -> List[int]:
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    return [min((a * h + b) % _MINHASH_PRIME for h in hashes) for a, b in _MINHASH_PARAMS]
+
+def group_near_duplicates(
+    titles: List[str],
+    editions: List[Tuple[str, str, str, str, str]],
+    sources: List[Tuple[str, str]],
+) -> List[int]:
+    """
+    近似重複タイトルをまとめ、各レコードのグループ代表インデックスを返す。
+
+    - MinHash の LSH バンドで候補ペアを絞るため、全件総当たりにはならない。
+    - 候補ペアは n-gram 集合の Jaccard 係数が JACCARD_THRESHOLD 以上のものだけ統合する。
+      固有部分が短いもの（MIN_SHINGLES 未満）は年版か版数の一致も必要。
+    - 版（年版・第N版）や文書種別が食い違うグループ同士は統合しない。
+    - 同じ出版社が別 URL で掲載しているもの（sources = (出版社, URL)）は別文書として扱う。
+    - まず版情報が完全に一致するもの同士をまとめ、その後、年版などが欠けたグループを
+      候補のうち最新の版（年版 → 版数が大きいもの）に 1 つだけ寄せる。
+      結果は入力行の順序に依存しない。
+    """
+    parent = list(range(len(titles)))
+    group_edition = [list(e) for e in editions]
+    group_sources = [{p: u} for p, u in sources]
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> bool:
+        ri, rj = find(i), find(j)
+        if ri == rj:
+            return True
+        ei, ej = tuple(group_edition[ri]), tuple(group_edition[rj])
+        if not _editions_compatible(ei, ej):
+            return False
+        si, sj = group_sources[ri], group_sources[rj]
+        if any(p in si and si[p] != u for p, u in sj.items()):
+            return False
+        if rj < ri:
+            ri, rj = rj, ri
+        parent[rj] = ri
+        group_edition[ri] = [x or y for x, y in zip(ei, ej)]
+        group_sources[ri] = {**si, **sj}
+        return True
+
+    # 旧レポートと今回取得分で同じタイトルが並ぶため、署名はタイトル単位で使い回す
+    by_title: Dict[str, Tuple[set, Optional[List[int]]]] = {}
+    signatures: Dict[int, List[int]] = {}
+    shingles: Dict[int, set] = {}
+    for i, title in enumerate(titles):
+        if title not in by_title:
+            sh = _title_shingles(title)
+            by_title[title] = (sh, _minhash(sh) if sh else None)
+        sh, sig = by_title[title]
+        if sig:
+            signatures[i] = sig
+            shingles[i] = sh
+
+    rows_per_band = MINHASH_PERM // MINHASH_BANDS
+    checked: set = set()
+    pairs: List[Tuple[int, int]] = []
+    for band in range(MINHASH_BANDS):
+        lo = band * rows_per_band
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        for i, sig in signatures.items():
+            buckets.setdefault(tuple(sig[lo:lo + rows_per_band]), []).append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    i, j = members[x], members[y]
+                    if (i, j) in checked:
+                        continue
+                    checked.add((i, j))
+                    si, sj = shingles[i], shingles[j]
+                    if len(si & sj) / len(si | sj) < JACCARD_THRESHOLD:
+                        continue
+                    if min(len(si), len(sj)) < MIN_SHINGLES and not _editions_confirmed(editions[i], editions[j]):
+                        continue
+                    pairs.append((i, j))
+
+    # 行の並びに左右されないよう、タイトル・掲載元の内容で処理順を決める
+    def order_key(i: int) -> Tuple[str, Tuple[str, str], Tuple[str, str, str, str, str]]:
+        return (titles[i], sources[i], editions[i])
+
+    pairs.sort(key=lambda ij: sorted((order_key(ij[0]), order_key(ij[1]))))
+
+    # 1) 版情報が完全に一致するもの同士
+    for i, j in pairs:
+        if editions[i] == editions[j]:
+            union(i, j)
+
+    # 2) 版情報が欠けているグループを、候補のうち最新の版へ寄せる
+    neighbours: Dict[int, set] = {}
+    for i, j in pairs:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            neighbours.setdefault(ri, set()).add(rj)
+            neighbours.setdefault(rj, set()).add(ri)
+    group_title: Dict[int, str] = {}
+    for i, title in enumerate(titles):
+        r = find(i)
+        group_title[r] = min(group_title.get(r, title), title)
+
+    def latest_first(r: int) -> Tuple[int, int, str]:
+        e = group_edition[r]
+        return (-int(e[0] or 0), -int(e[1] or 0), group_title[r])
+
+    # 情報の多いグループから順に寄せることで、寄せ先の版情報が先に確定する
+    for r in sorted(neighbours, key=lambda r: (-_edition_specificity(tuple(group_edition[r])), group_title[r])):
+        partial = tuple(group_edition[find(r)])
+        candidates = [
+            c for c in {find(n) for n in neighbours[r]} - {find(r)}
+            if _edition_covers(partial, tuple(group_edition[c]))
+        ]
+        for c in sorted(candidates, key=latest_first):
+            title = min(group_title[find(r)], group_title[c])
+            if union(r, c):
+                group_title[find(r)] = title
+                break
+
+    return [find(i) for i in range(len(titles))]
+
+def _edition_suffix(e: Tuple[str, ...]) -> str:
+    # 論理ID の末尾に付ける版表記（例: "_2021_第5版"）。年版・版数とも不明なら空文字
+    parts = [e[0], f"第{e[1]}版" if e[1] else ""]
+    return "".join(f"_{p}" for p in parts if p)
+
+def _canonical_rank(row: pd.Series) -> Tuple[int, int, int]:
+    """
+    同一グループ内で代表レコードを選ぶための順位（小さいほど優先）。
+    版情報が明記されたもの → 日付が多く取れているもの → 学会等の Web ページの順。
+    """
+    edition = extract_edition(str(row["正式タイトル"]), str(row["版情報"]))
+    known = sum(1 for c in ("発刊日", "改訂日") if str(row[c]).strip())
+    return (0 if any(edition[:2]) else 1, -known, 0 if row["種別"] == "Web" else 1)
+
+def _pick_canonical(group: pd.DataFrame):
+    ranks = [(_canonical_rank(r), pos) for pos, (_, r) in enumerate(group.iterrows())]
+    return group.index[min(ranks)[1]]
+
+def merge_near_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    出版社をまたいだ同一ガイドライン（同一版）の論理IDを 1 つに揃える。
+    既存レポートで先に検知された論理IDを優先して引き継ぐ。
+
+    normalize_title は年を落とすため、別の版が同じ論理IDになることがある。
+    その場合は版表記（年版・第N版）を末尾に付けて版ごとに別の行として残す。
+    既存レポートに載っている論理IDは書き換えず、新しく現れたグループにだけ付ける。
+    """
+    if df.empty:
+        return df
+    df = df.reset_index(drop=True)
+    titles = df["正式タイトル"].astype(str).tolist()
+    publishers = df["出版社"].astype(str).tolist()
+    editions = [extract_edition(t, str(h)) for t, h in zip(titles, df["版情報"].astype(str))]
+    sources = list(zip(publishers, df["URL"].astype(str)))
+    # 単一PDF監視の行（タイトル = 監視対象名）は比較対象にしない
+    titles = [
+        "" if kind == "PDF" and t == p else t
+        for t, p, kind in zip(titles, publishers, df["種別"].astype(str))
+    ]
+    roots = group_near_duplicates(titles, editions, sources)
+
+    ids = df["論理ID"].astype(str).tolist()
+    first = df["初回検知日"].astype(str).str.strip().tolist()
+    canonical: Dict[int, Tuple[Tuple[str, int], str]] = {}
+    for i, root in enumerate(roots):
+        # 初回検知日が古い論理IDほど優先（空は最後）、同日なら先に現れたもの
+        key = (first[i] or "9999-99-99", i)
+        cur = canonical.get(root)
+        if cur is None or key < cur[0]:
+            canonical[root] = (key, ids[i])
+
+    group_edition: Dict[int, List[str]] = {}
+    for e, root in zip(editions, roots):
+        cur = group_edition.setdefault(root, list(e))
+        group_edition[root] = [x or y for x, y in zip(cur, e)]
+
+    suffixes: Dict[str, set] = {}
+    owners: Dict[str, Tuple[Tuple[str, int], int]] = {}
+    for root, (key, lid) in canonical.items():
+        suffixes.setdefault(lid, set()).add(_edition_suffix(tuple(group_edition[root])))
+        # 既存レポート由来（初回検知日あり）で最も古いグループがその論理IDの持ち主
+        if key[0] != "9999-99-99" and (lid not in owners or key < owners[lid][0]):
+            owners[lid] = (key, root)
+    final_ids: Dict[int, str] = {}
+    for root, (_, lid) in canonical.items():
+        # 同じ論理IDを異なる版のグループが共有している場合のみ、持ち主以外に版表記を付ける
+        if len(suffixes[lid]) > 1 and (lid not in owners or owners[lid][1] != root):
+            lid += _edition_suffix(tuple(group_edition[root]))
+        final_ids[root] = lid
+    df["論理ID"] = [final_ids[r] for r in roots]
+    return df
+
 # =========================
 # 監視対象
 # =========================
@@ -427,9 +840,7 @@ def extract_dates_for_url(url: str) -> Dict[str, DateEvidence]:
     if url.lower().endswith(".pdf"):
         return _extract_from_pdf(url)
     try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT_GET)
-        r.raise_for_status()
-        return _extract_from_html(url, r.content)
+        return _extract_from_html(url, fetch_html(url))
     except Exception:
         return {"publication": _unknown(url), "revision": _unknown(url)}
 
@@ -468,9 +879,7 @@ def check_site(target: Dict) -> List[Dict]:
             return rows
 
         # --- HTML一覧ページ取得 ---
-        res = requests.get(target["url"], headers=HEADERS, timeout=TIMEOUT_GET)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.content, "html.parser")
+        soup = BeautifulSoup(fetch_html(target["url"]), "html.parser")
 
         # --- PDFリンク一覧（リンク先=PDFを読む） ---
         if target["type"] == "html_pdf_index":
@@ -609,6 +1018,9 @@ def main():
         print(f"Checking {t['name']}")
         rows.extend(check_site(t))
 
+    # ホストごとに学習した文字コードを次回実行へ引き継ぐ
+    save_encoding_cache()
+
     if not rows:
         print("No data collected.")
         return
@@ -625,21 +1037,24 @@ def main():
     # レポート更新のために、論理ID単位で旧データと新規データをマージする。
     # concat で旧→新の順に結合し、同一IDであれば新規データを優先して選択する。
     combined = pd.concat([old, current], ignore_index=True, sort=False)
+    # 出版社・学会をまたいだ同一ガイドライン（同一版）は 1 つの論理IDにまとめる
+    combined = merge_near_duplicates(combined)
 
     final_rows = []
     today_dt = datetime.strptime(TODAY, "%Y-%m-%d")
 
     for logical_id, group in combined.groupby("論理ID", sort=False):
-        # 最新行を選択：検知日が今日の行があればそれを使用、なければ最後の行を使用
+        # 最新行を選択：検知日が今日の行があればその中の代表レコード、なければ最後の行を使用
         idx_new = group.index[group["検知日"] == TODAY]
         if len(idx_new) > 0:
-            row = group.loc[idx_new[0]].copy()
+            row = group.loc[_pick_canonical(group.loc[idx_new])].copy()
         else:
             row = group.iloc[-1].copy()
 
         # 初回検知日を保持（旧レポートに存在する場合はそれを引き継ぐ）
-        # group 内には旧データと新規データの両方が存在する可能性がある。
-        first_detect = group["初回検知日"].dropna().iloc[0] if any(group["初回検知日"].astype(str).str.strip()) else ""
+        # group 内には旧データと新規データ、統合された他出版社の行が存在する可能性があるため最古を採用する。
+        detected = [d for d in group["初回検知日"].astype(str).str.strip() if d]
+        first_detect = min(detected) if detected else ""
         # 初回検知日がない場合（初登場）は今日の日付を入れる
         if not first_detect:
             row["初回検知日"] = TODAY